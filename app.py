@@ -6,6 +6,7 @@ import os
 from pydub import AudioSegment
 from dotenv import load_dotenv
 from query_engine import get_answer
+from tracing import trace, span
 
 # Load environment variables from the .env file
 load_dotenv()
@@ -59,6 +60,19 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# --- Optional Latency Debug Panel ---
+if st.sidebar.checkbox("🐞 Show latency debug panel"):
+    st.sidebar.markdown("##### ⏱️ Last Answer Timings")
+    if "last_trace" in st.session_state:
+        last_trace = st.session_state["last_trace"]
+        st.sidebar.metric("Total", f"{last_trace['total_ms']:.0f} ms")
+        st.sidebar.table([
+            {"Stage": "· " * s["depth"] + s["span"], "ms": f"{s['ms']:.1f}"}
+            for s in last_trace["spans"]
+        ])
+    else:
+        st.sidebar.caption("Ask a question to see per-stage timings.")
+
 st.title("Hi! I'm Aggy, Your Medical Research Assistant")
 st.markdown("##### Ask anything from the document")
 
@@ -128,24 +142,30 @@ if len(audio_data_segment) > 0:
         
         question_audio_bytes = wav_bytes_io.getvalue()
         
-        with st.spinner("Processing..."):
-            wav_bytes_io.seek(0)
-            transcription = openai_client.audio.transcriptions.create(
-                model="whisper-1",
-                file=wav_bytes_io,
-                language="en"
-            )
-            question_text = transcription.text
+        with trace("voice_query") as timings:
+            with st.spinner("Processing..."):
+                wav_bytes_io.seek(0)
+                with span("whisper_transcription"):
+                    transcription = openai_client.audio.transcriptions.create(
+                        model="whisper-1",
+                        file=wav_bytes_io,
+                        language="en"
+                    )
+                question_text = transcription.text
+                
+                with span("get_answer"):
+                    answer, sources = get_answer(question_text, chat_history=st.session_state["chat"])
             
-            answer, sources = get_answer(question_text, chat_history=st.session_state["chat"])
+            with st.spinner("🔊 Generating response..."):
+                with span("tts"):
+                    audio_response = openai_client.audio.speech.create(
+                        model="tts-1",
+                        voice="alloy",
+                        input=answer
+                    )
+                    answer_audio_bytes = audio_response.read()
         
-        with st.spinner("🔊 Generating response..."):
-            audio_response = openai_client.audio.speech.create(
-                model="tts-1",
-                voice="alloy",
-                input=answer
-            )
-            answer_audio_bytes = audio_response.read()
+        st.session_state["last_trace"] = timings
         
         st.session_state["chat"].append({
             "role": "user", 
@@ -0,0 +1,353 @@
+import os
+import io
+import sys
+import json
+import time
+import wave
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ✅ Benchmark configuration
+CORPUS_SIZES = [10, 50, 200]   # Number of synthetic documents per run
+WORDS_PER_DOC = 1500
+UPDATE_FRACTION = 0.1          # Extra documents fed to update_index, relative to corpus size
+NUM_QUERIES = 50
+WARMUP_QUERIES = 3
+SEED = 42
+
+VOCABULARY = (
+    "patient blood marrow stem cell transplant leukemia lymphoma myeloma anemia platelet "
+    "neutrophil hemoglobin chemotherapy radiation dose toxicity infection graft host disease "
+    "remission relapse biopsy diagnosis prognosis therapy treatment protocol trial outcome "
+    "survival risk factor mutation gene cytogenetic marker antibody immune response fever "
+    "fatigue bleeding transfusion iron deficiency oncology hematology clinical study cohort"
+).split()
+
+QUERIES = [
+    "What are the side effects and complications of hematopoietic stem cell transplantation?",
+    "What is blood cancer?",
+    "How is acute myeloid leukemia diagnosed?",
+    "What is the prognosis for multiple myeloma after relapse?",
+    "When is a platelet transfusion indicated?",
+    "How is graft versus host disease treated?",
+    "What causes iron deficiency anemia?",
+    "Which cytogenetic markers predict lymphoma survival?",
+]
+
+
+# --- Local OpenAI / Azure stub ---
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Minimal OpenAI-compatible endpoint: chat completions (Azure deployment
+    routes included), Whisper transcriptions and TTS speech.
+    """
+    latency_s = 0.0
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.latency_s)
+        path = self.path.split("?")[0]
+
+        if path.endswith("/chat/completions"):
+            request = json.loads(body)
+            self._send_json({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model") or "stub",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "Stub answer [Source: doc_0.txt - chunk 0]."},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": len(body) // 4, "completion_tokens": 8, "total_tokens": len(body) // 4 + 8},
+            })
+        elif path.endswith("/audio/transcriptions"):
+            # The benchmark passes the question it wants "heard" in a header
+            self._send_json({"text": self.headers.get("X-Stub-Transcript", QUERIES[0])})
+        elif path.endswith("/audio/speech"):
+            audio = b"\xff\xf3" + b"\x00" * 4096
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/mpeg")
+            self.send_header("Content-Length", str(len(audio)))
+            self.end_headers()
+            self.wfile.write(audio)
+        else:
+            self._send_json({"error": {"message": f"Unknown stub route {path}"}}, status=404)
+
+    def _send_json(self, payload, status=200):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+
+def start_stub_server(latency_ms=0.0):
+    """
+    Start the stub on a free localhost port in a daemon thread and return (server, base_url).
+    """
+    StubHandler.latency_s = latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# --- Synthetic corpus ---
+
+def generate_document(rng: random.Random, num_words=WORDS_PER_DOC) -> str:
+    sentences = []
+    words_left = num_words
+    while words_left > 0:
+        length = min(rng.randint(8, 24), words_left)
+        words = [rng.choice(VOCABULARY) for _ in range(length)]
+        sentences.append(" ".join(words).capitalize() + ".")
+        words_left -= length
+        if rng.random() < 0.1:
+            sentences.append("\n\n")
+    return " ".join(sentences)
+
+
+def write_corpus(text_dir: str, num_docs: int, rng: random.Random, prefix="doc"):
+    os.makedirs(text_dir, exist_ok=True)
+    for i in range(num_docs):
+        with open(os.path.join(text_dir, f"{prefix}_{i}.txt"), "w", encoding="utf-8") as f:
+            f.write(generate_document(rng))
+
+
+def silent_wav(seconds=0.5, rate=16000) -> io.BytesIO:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"\x00\x00" * int(seconds * rate))
+    buf.seek(0)
+    buf.name = "audio.wav"
+    return buf
+
+
+# --- Measurement helpers ---
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process so far (MB), or None if unavailable.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def rss_fields(baseline_mb):
+    """
+    Peak RSS so far and its growth over the post-import baseline, rounded to 0.1 MB.
+    """
+    peak = peak_rss_mb()
+    if peak is None:
+        return {"peak_rss_mb": None, "rss_growth_mb": None}
+    return {"peak_rss_mb": round(peak, 1), "rss_growth_mb": round(peak - baseline_mb, 1)}
+
+
+def latency_stats(samples_ms):
+    p50, p95, p99 = np.percentile(samples_ms, [50, 95, 99])
+    return {"count": len(samples_ms), "p50_ms": round(p50, 2), "p95_ms": round(p95, 2), "p99_ms": round(p99, 2)}
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+# --- Workloads ---
+
+def run_size(num_docs, args, base_url):
+    """
+    Benchmark one corpus size. Runs in its own spawned process (see main) so that
+    peak RSS reflects only this size, measured against the RSS after imports.
+    """
+    # Stub credentials must be in place before query_engine creates its Azure client
+    os.environ["AZURE_OPENAI_KEY"] = "stub"
+    os.environ["AZURE_OPENAI_ENDPOINT"] = base_url
+    os.environ["AZURE_OPENAI_DEPLOYMENT_NAME"] = "stub-gpt-4o"
+    os.environ.setdefault("TRACE_LOG_LEVEL", "WARNING")  # Per-query trace logs would drown the report
+
+    import openai
+    import tracing
+    import data_preprocessor
+    import embeddings_manager
+    import retriever
+    import query_engine
+
+    openai_client = openai.OpenAI(api_key="stub", base_url=f"{base_url}/v1")
+    baseline_mb = peak_rss_mb()
+
+    rng = random.Random(SEED + num_docs)
+    work_dir = tempfile.mkdtemp(prefix=f"aggy_bench_{num_docs}_")
+    text_dir = os.path.join(work_dir, "texts")
+    chunk_dir = os.path.join(work_dir, "chunks")
+    index_dir = os.path.join(work_dir, "index")
+
+    # Point ingest + retrieval at the scratch directory
+    embeddings_manager.INDEX_DIR = index_dir
+    embeddings_manager.CHUNKS_FILE = os.path.join(chunk_dir, "chunks.json")
+    retriever.INDEX_DIR = index_dir
+
+    report = {
+        "num_docs": num_docs,
+        "baseline_rss_mb": round(baseline_mb, 1) if baseline_mb is not None else None,
+        "stages": {},
+    }
+    try:
+        write_corpus(text_dir, num_docs, rng)
+
+        # ✅ Ingest: chunking
+        chunks, elapsed = timed(data_preprocessor.process_documents, text_dir, chunk_dir)
+        report["num_chunks"] = len(chunks)
+        report["process_documents"] = {
+            "seconds": round(elapsed, 3),
+            "docs_per_s": round(num_docs / elapsed, 2),
+            **rss_fields(baseline_mb),
+        }
+
+        # ✅ Ingest: full index build
+        _, elapsed = timed(embeddings_manager.build_index, overwrite=True)
+        report["build_index"] = {
+            "seconds": round(elapsed, 3),
+            "chunks_per_s": round(len(chunks) / elapsed, 2),
+            **rss_fields(baseline_mb),
+        }
+
+        # ✅ Ingest: incremental update with fresh documents
+        new_chunks = []
+        for i in range(max(1, int(num_docs * UPDATE_FRACTION))):
+            for j, chunk in enumerate(data_preprocessor.split_into_chunks(generate_document(rng))):
+                new_chunks.append({"text": chunk, "meta": {"source": f"update_{i}.txt", "chunk_id": j}})
+        _, elapsed = timed(embeddings_manager.update_index, new_chunks)
+        report["update_index"] = {
+            "seconds": round(elapsed, 3),
+            "chunks_per_s": round(len(new_chunks) / elapsed, 2),
+            **rss_fields(baseline_mb),
+        }
+
+        # ✅ Query: whisper -> get_answer -> tts, mirroring app.py
+        def voice_query(question):
+            with tracing.trace("voice_query", benchmark_docs=num_docs) as timings:
+                with tracing.span("whisper_transcription"):
+                    transcription = openai_client.audio.transcriptions.create(
+                        model="whisper-1",
+                        file=silent_wav(),
+                        language="en",
+                        extra_headers={"X-Stub-Transcript": question},
+                    )
+                with tracing.span("get_answer"):
+                    answer, sources = query_engine.get_answer(transcription.text, top_k=args.top_k)
+                with tracing.span("tts"):
+                    openai_client.audio.speech.create(model="tts-1", voice="alloy", input=answer).read()
+            return timings, sources
+
+        for i in range(args.warmup):
+            voice_query(QUERIES[i % len(QUERIES)])
+
+        totals, stage_samples, errors = [], {}, 0
+        start = time.perf_counter()
+        for i in range(args.queries):
+            timings, sources = voice_query(QUERIES[i % len(QUERIES)])
+            if not sources:
+                errors += 1
+            totals.append(timings["total_ms"])
+            for s in timings["spans"]:
+                stage_samples.setdefault(s["span"], []).append(s["ms"])
+        elapsed = time.perf_counter() - start
+
+        report["query"] = {
+            **latency_stats(totals),
+            "queries_per_s": round(args.queries / elapsed, 2),
+            "errors": errors,
+            **rss_fields(baseline_mb),
+        }
+        report["stages"] = {name: latency_stats(samples) for name, samples in stage_samples.items()}
+    finally:
+        if args.keep:
+            print(f"📁 Kept benchmark data in {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return report
+
+
+def format_rss(r):
+    if r["peak_rss_mb"] is None:
+        return "RSS n/a"
+    return f"peak RSS {r['peak_rss_mb']:.1f} MB (+{r['rss_growth_mb']:.1f} MB)"
+
+
+def print_report(report):
+    print(f"\n=== {report['num_docs']} docs / {report['num_chunks']} chunks ===")
+    if report["baseline_rss_mb"] is not None:
+        print(f"baseline RSS after imports {report['baseline_rss_mb']:.1f} MB")
+    for phase in ("process_documents", "build_index", "update_index"):
+        r = report[phase]
+        rate_key = "docs_per_s" if "docs_per_s" in r else "chunks_per_s"
+        print(f"{phase:<18} {r['seconds']:>9.3f} s  {r[rate_key]:>9.2f} {rate_key.replace('_per_s', '/s'):<9} {format_rss(r)}")
+    q = report["query"]
+    print(f"{'query':<18} p50 {q['p50_ms']:.1f} ms  p95 {q['p95_ms']:.1f} ms  p99 {q['p99_ms']:.1f} ms  "
+          f"{q['queries_per_s']:.2f} q/s  errors {q['errors']}  {format_rss(q)}")
+    for name, s in report["stages"].items():
+        print(f"  {name:<22} p50 {s['p50_ms']:>8.2f}  p95 {s['p95_ms']:>8.2f}  p99 {s['p99_ms']:>8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline ingest + query benchmark against local OpenAI/Azure stubs.")
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")], default=CORPUS_SIZES,
+                        help="Comma-separated corpus sizes in documents (default: %(default)s)")
+    parser.add_argument("--queries", type=int, default=NUM_QUERIES)
+    parser.add_argument("--warmup", type=int, default=WARMUP_QUERIES)
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument("--stub-latency-ms", type=float, default=0.0,
+                        help="Artificial delay added by the stub to every API call")
+    parser.add_argument("--json", help="Also write the full report to this file")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated corpus and index on disk")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.stub_latency_ms)
+
+    # ✅ One fresh process per size so model memory and earlier sizes don't mask RSS changes
+    spawn = multiprocessing.get_context("spawn")
+    reports = []
+    try:
+        for num_docs in args.sizes:
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+                report = executor.submit(run_size, num_docs, args, base_url).result()
+            print_report(report)
+            reports.append(report)
+    finally:
+        server.shutdown()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+        print(f"\n✅ Report saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
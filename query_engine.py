@@ -2,6 +2,7 @@ import os
 from retriever import hybrid_search
 from dotenv import load_dotenv
 from openai import AzureOpenAI
+from tracing import span
 
 load_dotenv()
 
@@ -58,25 +59,28 @@ Answer:
 
 def get_answer(question, top_k=8, chat_history=[]):
     # Retrieve top chunks (semantic + keyword)
-    chunks = hybrid_search(question, top_k=top_k)
+    with span("hybrid_search"):
+        chunks = hybrid_search(question, top_k=top_k)
 
     if not chunks:
         return "No relevant context found. Please check your documents.", []
 
     # Build optimized prompt with chat history
-    prompt = build_prompt(question, chunks, chat_history)
+    with span("build_prompt"):
+        prompt = build_prompt(question, chunks, chat_history)
 
     try:
         # Call Azure GPT-4o
-        response = client.chat.completions.create(
-            model=deployment_name,
-            messages=[
-                {"role": "system", "content": "You are a helpful and precise medical assistant. Use the provided context and chat history to answer questions about hematology and oncology."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.2,
-            max_tokens=800
-        )
+        with span("azure_completion", model=deployment_name):
+            response = client.chat.completions.create(
+                model=deployment_name,
+                messages=[
+                    {"role": "system", "content": "You are a helpful and precise medical assistant. Use the provided context and chat history to answer questions about hematology and oncology."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.2,
+                max_tokens=800
+            )
 
         answer = response.choices[0].message.content.strip()
         sources = [f"{c['meta']['source']} (chunk {c['meta']['chunk_id']})" for c in chunks]
@@ -0,0 +1,61 @@
+import os
+import sys
+import json
+import time
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# ✅ Structured trace logs go to stderr as one JSON object per line
+logger = logging.getLogger("aggy.trace")
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(os.getenv("TRACE_LOG_LEVEL", "INFO").upper())
+    logger.propagate = False
+
+# Active trace for the current request (None when nothing is being traced)
+_current_trace = ContextVar("current_trace", default=None)
+
+
+@contextmanager
+def trace(name: str, **fields):
+    """
+    Collect timing spans for one request (e.g. a voice question end to end).
+    Yields a record {"trace", "total_ms", "spans"}; spans are listed in start
+    order and each one's "ms" is filled in when it finishes.
+    """
+    record = {"trace": name, "total_ms": None, "spans": []}
+    state = {"start": time.perf_counter(), "depth": 0, "spans": record["spans"]}
+    token = _current_trace.set(state)
+    try:
+        yield record
+    finally:
+        _current_trace.reset(token)
+        record["total_ms"] = round((time.perf_counter() - state["start"]) * 1000, 2)
+        logger.info(json.dumps({"event": "trace", **record, **fields}, default=str))
+
+
+@contextmanager
+def span(name: str, **fields):
+    """
+    Time a single pipeline stage. Nested spans record their depth so callers
+    can render them as a tree. Outside of a trace the span is only logged.
+    """
+    state = _current_trace.get()
+    start = time.perf_counter()
+    record = {"span": name, "ms": None, "depth": 0, **fields}
+    if state is not None:
+        # Add the record on entry so the trace keeps spans in start order
+        record["depth"] = state["depth"]
+        record["start_ms"] = round((start - state["start"]) * 1000, 2)
+        state["depth"] += 1
+        state["spans"].append(record)
+    try:
+        yield
+    finally:
+        record["ms"] = round((time.perf_counter() - start) * 1000, 2)
+        if state is not None:
+            state["depth"] -= 1
+        logger.debug(json.dumps({"event": "span", **record}, default=str))